@@ -8,19 +8,26 @@ from typing import List
 # commit history.
 # Please refer to ``pyscaffold`` if that is needed.
 
+import hashlib
+import json
+import mmap
+import os
 import re
+import secrets
 import stat
+import zipfile
 from functools import partial
-from pathlib import Path
-from typing import List
+from pathlib import Path, PurePosixPath
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional, Tuple
 
 from pyscaffold import file_system as fs
 from pyscaffold.actions import Action, ActionParams, ScaffoldOpts, Structure
-from pyscaffold.extensions import Extension
+from pyscaffold.extensions import Extension, include, store_with
 from pyscaffold.log import logger
 from pyscaffold.operations import add_permissions
-from pyscaffold.shell import get_command
-from pyscaffold.structure import merge, reify_content, resolve_leaf
+from pyscaffold.shell import ShellCommand, get_command
+from pyscaffold.structure import AbstractContent, merge, reify_content, resolve_leaf
 from pyscaffold.templates import get_template
 
 from . import templates
@@ -28,6 +35,53 @@ from . import templates
 django_admin = get_command("django-admin")
 template = partial(get_template, relative_to=templates)
 
+DATABASE_BACKENDS = ("sqlite", "postgres")
+"""Values accepted by the ``--django-db`` option (the first one is the default)"""
+
+DATABASE_REQUIREMENTS = {
+    "sqlite": ["django"],
+    "postgres": ["django>=4.2", "psycopg[binary,pool]"],
+}
+"""Requirements of the project for each one of the database backends
+(psycopg 3 is only supported by Django >= 4.2)
+"""
+
+MINIMAL_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+]
+"""Apps removed from the generated ``settings.py`` by ``--django-minimal``"""
+
+MINIMAL_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+]
+"""Middleware removed from the generated ``settings.py`` by ``--django-minimal``"""
+
+SKELETON_PLACEHOLDER = "pyscaffoldext_django_skeleton"
+"""Project name given to django-admin when exporting a skeleton bundle"""
+
+SKELETON_METADATA = "skeleton.json"
+"""Member of a skeleton bundle with its metadata (Django version, SHA-256 of the
+files...)"""
+
+SKELETON_FORMAT = 1
+"""Version of the format of the skeleton bundles"""
+
+MANIFEST = "django-files.sha256"
+"""File listing the hashes of the Django files when ``--django-seed`` is given"""
+
+DEFAULT_SOURCE_DATE_EPOCH = 315532800
+"""Modification time of the files when ``--django-seed`` is given (1980-01-01, the
+earliest date supported by zip files), unless ``SOURCE_DATE_EPOCH`` is defined"""
+
+SECRET_KEY_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*(-_=+)"
+"""Same characters used by :obj:`django.core.management.utils.get_random_secret_key`"""
+
 UPDATE_WARNING = (
     "Updating code generated using external tools is not "
     "supported. The extension `django` will be ignored, only "
@@ -40,10 +94,71 @@ class Django(Extension):
 
     persist = False
 
+    def augment_cli(self, parser):
+        """Add the ``--django`` flag and the options that customise the generated
+        project. See :obj:`pyscaffold.extension.Extension.augment_cli`.
+        """
+        super().augment_cli(parser)
+        parser.add_argument(
+            f"{self.flag}-db",
+            dest="django_db",
+            choices=DATABASE_BACKENDS,
+            action=store_with(self),
+            help="database backend configured in the generated settings.py "
+            f"(default: {DATABASE_BACKENDS[0]})",
+        )
+        parser.add_argument(
+            f"{self.flag}-tasks",
+            dest="django_tasks",
+            action=store_true_with(self),
+            help="add an app for running background tasks stored in the database",
+        )
+        parser.add_argument(
+            f"{self.flag}-replica",
+            dest="django_replica",
+            action=store_true_with(self),
+            help="add a read replica database and a router sending reads to it",
+        )
+        parser.add_argument(
+            f"{self.flag}-minimal",
+            dest="django_minimal",
+            action=store_true_with(self),
+            help="skeleton for API services: without admin, auth, sessions, "
+            "messages, staticfiles (and their middleware) and templates",
+        )
+        parser.add_argument(
+            f"{self.flag}-skeleton",
+            dest="django_skeleton",
+            metavar="BUNDLE",
+            action=store_with(self),
+            help="extract the files created by django-admin from a bundle exported "
+            "with putup-django-skeleton (django-admin is not used)",
+        )
+        parser.add_argument(
+            f"{self.flag}-skeleton-sha256",
+            dest="django_skeleton_sha256",
+            metavar="DIGEST",
+            action=store_with(self),
+            help="refuse the bundle of --django-skeleton unless its SHA-256 is DIGEST "
+            "(as printed by putup-django-skeleton export)",
+        )
+        parser.add_argument(
+            f"{self.flag}-seed",
+            dest="django_seed",
+            metavar="SEED",
+            action=store_with(self),
+            help="generate identical files for identical inputs: SECRET_KEY is read "
+            "from $DJANGO_SECRET_KEY at runtime (with a default derived from SEED), "
+            "the modification times are set to $SOURCE_DATE_EPOCH and the hashes of "
+            f"the Django files are listed in {MANIFEST}",
+        )
+        return self
+
     def activate(self, actions: List[Action]) -> List[Action]:
         """Activate extension. See :obj:`pyscaffold.extension.Extension.activate`."""
         actions = self.register(actions, enforce_options, after="get_default_options")
         actions = self.register(actions, create_django)
+        actions = self.register(actions, write_manifest, after="create_structure")
         return self.register(actions, instruct_user, before="report_done")
 
 
@@ -52,13 +167,19 @@ def enforce_options(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
     See :obj:`pyscaffold.actions.Action`.
     """
     opts["force"] = True
-    opts.setdefault("requirements", []).append("django")
+    opts["django_db"] = opts.get("django_db") or DATABASE_BACKENDS[0]
+    if opts["django_db"] not in DATABASE_BACKENDS:
+        raise UnsupportedDatabaseBackend(opts["django_db"])
+
+    requirements = opts.setdefault("requirements", [])
+    requirements.extend(DATABASE_REQUIREMENTS[opts["django_db"]])
 
     return struct, opts
 
 
 def create_django(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
-    """Creates a standard Django project with django-admin.
+    """Creates a standard Django project with django-admin (or from a skeleton
+    bundle, see :obj:`export_skeleton`).
     See :obj:`pyscaffold.actions.Action`.
     Raises:
         :obj:`RuntimeError`: raised if django-admin is not installed
@@ -67,16 +188,170 @@ def create_django(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
         logger.warning(UPDATE_WARNING)
         return struct, opts
 
+    pretend = opts.get("pretend")
+    project_path = Path(opts["project_path"])
+    pkg_name = opts["package"]
+    pkg_dir = project_path / "src" / pkg_name
+    if opts.get("django_skeleton"):
+        bundle = Path(opts["django_skeleton"])
+        digest = opts.get("django_skeleton_sha256")
+        extract_skeleton(bundle, project_path, pkg_name, digest, pretend=pretend)
+    else:
+        startproject(project_path, pkg_name, pretend=pretend)
+
+    settings = pkg_dir / "settings.py"
+    replace_default_database(logger, settings, pretend=pretend)
+    key = None
+    if opts.get("django_seed") is not None:
+        # The real key is read when the project runs, so it is not written in the
+        # files (and does not change them)
+        default = secret_key(opts["django_seed"])
+        key = f'os.environ.get(\n    "DJANGO_SECRET_KEY",\n    "{default}",\n)'
+    elif opts.get("django_skeleton"):
+        # Otherwise all the projects created from a bundle would share the same key
+        key = repr(secret_key())
+    if key:
+        replace_in_file(
+            logger,
+            settings,
+            SECRET_KEY_PATTERN,
+            f"SECRET_KEY = {key}",
+            "SECRET_KEY",
+            pretend=pretend,
+        )
+    if opts["django_db"] == "postgres":
+        add_imports(logger, settings, "import os", "import django", pretend=pretend)
+        databases = template("databases_postgres").substitute(opts)
+        replace_in_file(
+            logger, settings, DATABASES_PATTERN, databases, "DATABASES", pretend=pretend
+        )
+
+    if opts.get("django_replica"):
+        add_imports(logger, settings, "import copy", "import os", pretend=pretend)
+        replica = template("databases_replica").substitute(opts)
+        target = "DATABASES (read replica)"
+        replace_in_file(
+            logger, settings, AFTER_DATABASES_PATTERN, replica, target, pretend=pretend
+        )
+        middleware = f"{opts['qual_pkg']}.routers.PinPrimaryMiddleware"
+        add_to_list_setting(logger, settings, "MIDDLEWARE", middleware, pretend=pretend)
+
+    if opts.get("django_minimal"):
+        remove_from_list_setting(
+            logger, settings, "INSTALLED_APPS", *MINIMAL_APPS, pretend=pretend
+        )
+        remove_from_list_setting(
+            logger, settings, "MIDDLEWARE", *MINIMAL_MIDDLEWARE, pretend=pretend
+        )
+        templates = "TEMPLATES = []\n"
+        replace_in_file(
+            logger, settings, TEMPLATES_PATTERN, templates, "TEMPLATES", pretend=pretend
+        )
+        urls = pkg_dir / "urls.py"
+        target = "imports (admin, path)"
+        replace_in_file(logger, urls, URLS_IMPORTS_PATTERN, "", target, pretend=pretend)
+        urlpatterns = "urlpatterns = []\n"
+        target = "admin URL"
+        replace_in_file(
+            logger, urls, ADMIN_URLS_PATTERN, urlpatterns, target, pretend=pretend
+        )
+
+    # Removed from the stack by Django unless DJANGO_MEMTRACE=1
+    middleware = f"{opts['qual_pkg']}.memtrace.MemoryTraceMiddleware"
+    add_to_list_setting(logger, settings, "MIDDLEWARE", middleware, pretend=pretend)
+
+    # The main package is also an app, so it can provide management commands
+    add_to_list_setting(
+        logger, settings, "INSTALLED_APPS", opts["qual_pkg"], pretend=pretend
+    )
+    add_imports(logger, settings, "import os", LOGGING_IMPORT, pretend=pretend)
+    logging_settings = template("logging_settings").substitute(opts)
+    append_to_file(logger, settings, logging_settings, "LOGGING", pretend=pretend)
+
+    for module, wrapper in (("wsgi", "WSGIHealthCheck"), ("asgi", "ASGIHealthCheck")):
+        file = pkg_dir / f"{module}.py"
+        add_imports(logger, file, f"from .health import {wrapper}", pretend=pretend)
+        wrapped = f"application = {wrapper}(get_{module}_application())"
+        target = "application (health checks)"
+        replace_in_file(
+            logger, file, APPLICATION_PATTERN, wrapped, target, pretend=pretend
+        )
+        hook = template("warmup_hook").template
+        append_to_file(logger, file, hook, "warm up", pretend=pretend)
+
+    contents, file_op = resolve_leaf(struct[".gitignore"])
+    gitignore = reify_content(contents, opts) + "{}\n\n# Django\n/*.sqlite3\n"
+
+    files: Structure = {
+        ".gitignore": (gitignore, file_op),
+        "manage.py": (template("manage"), add_permissions(stat.S_IXUSR)),
+        "benchmarks": {
+            "bench_logging.py": template("bench_logging"),
+            "bench_health.py": template("bench_health"),
+        },
+        "src": {
+            pkg_name: {
+                "apps.py": template("apps"),
+                "checks.py": template("checks"),
+                "log.py": template("log"),
+                "warmup.py": template("warmup"),
+                "health.py": template("health"),
+                "queryaudit.py": template("queryaudit"),
+                "memtrace.py": template("memtrace"),
+                "management": management_commands(
+                    warmup=template("warmup_command"),
+                    bulkload=template("bulkload_command"),
+                    queryaudit=template("queryaudit_command"),
+                    memreport=template("memreport_command"),
+                ),
+            }
+        },
+        "tests": {"conftest.py": template("conftest")},
+    }
+
+    if opts.get("django_tasks"):
+        app = f"{opts['qual_pkg']}.tasks"
+        add_to_list_setting(logger, settings, "INSTALLED_APPS", app, pretend=pretend)
+        files = merge(files, tasks_app(pkg_name))
+
+    if opts.get("django_minimal"):
+        bench = {"benchmarks": {"bench_minimal.py": template("bench_minimal")}}
+        files = merge(files, bench)
+
+    if opts.get("django_replica"):
+        replica_files = {
+            "src": {pkg_name: {"routers.py": template("routers")}},
+            "tests": {"test_routers.py": template("routers_test")},
+        }
+        files = merge(files, replica_files)
+
+    # Files created by django-admin are not part of the structure
+    generated = [] if pretend else [p for p in pkg_dir.iterdir() if p.is_file()]
+    opts["django_files"] = sorted(
+        {p.relative_to(project_path).as_posix() for p in generated}
+        | set(structure_paths(files))
+    )
+
+    return merge(struct, files), opts
+
+
+def startproject(
+    project_path: Path, pkg_name: str, command: ShellCommand = None, pretend=False
+):
+    """Run ``django-admin startproject``, moving the package into ``src`` and
+    ``manage.py`` into the package (as ``__main__.py``).
+
+    Raises:
+        :obj:`DjangoAdminNotInstalled`: if django-admin is not installed
+    """
+    command = command or django_admin
     try:
-        django_admin("--version")
+        command("--version")
     except Exception as e:
         raise DjangoAdminNotInstalled from e
 
-    pretend = opts.get("pretend")
-    project_path = Path(opts["project_path"])
-    pkg_name = opts["package"]
     fs.create_directory(project_path, pretend=pretend)
-    django_admin("startproject", pkg_name, str(project_path), pretend=pretend)
+    command("startproject", pkg_name, str(project_path), pretend=pretend)
 
     src_dir = project_path / "src"
     pkg_dir = src_dir / pkg_name
@@ -94,18 +369,269 @@ def create_django(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
         manage.rename(main)
     logger.report("move", manage, target=main)
 
-    settings = pkg_dir / "settings.py"
-    replace_default_database(logger, settings, pretend=pretend)
 
-    contents, file_op = resolve_leaf(struct[".gitignore"])
-    gitignore = reify_content(contents, opts) + "{}\n\n# Django\n/*.sqlite3\n"
+def export_skeleton(output: Optional[Path] = None, command: ShellCommand = None):
+    """Save the files created by :obj:`startproject` (with the version of Django of
+    ``command``, by default the django-admin in the ``PATH``) in a compressed bundle
+    that :obj:`create_django` can use instead of running django-admin.
 
-    files: Structure = {
-        ".gitignore": (gitignore, file_op),
-        "manage.py": (template("manage"), add_permissions(stat.S_IXUSR)),
+    The SHA-256 of each file is stored in the bundle, and the files are checked
+    with the patterns used to change them (so a new version of Django that is
+    not supported is detected when the bundle is exported).
+
+    Returns:
+        path of the bundle (by default ``django-skeleton-<version>.zip``)
+    """
+    command = command or django_admin
+    try:
+        version = "".join(command("--version")).strip()
+    except Exception as e:
+        raise DjangoAdminNotInstalled from e
+    output = Path(output or f"django-skeleton-{version}.zip")
+
+    with TemporaryDirectory() as tmp:
+        project_path = Path(tmp, "project")
+        startproject(project_path, SKELETON_PLACEHOLDER, command)
+        paths = sorted(p for p in project_path.rglob("*") if p.is_file())
+        files = {
+            p.relative_to(project_path).as_posix(): (p.read_bytes(), p.stat().st_mode)
+            for p in paths
+            if "__pycache__" not in p.parts
+        }
+
+    validate_skeleton(files)
+    # The key is replaced by create_django, and would make the bundle non-reproducible
+    settings = f"src/{SKELETON_PLACEHOLDER}/settings.py"
+    content, mode = files[settings]
+    content = SECRET_KEY_PATTERN.sub(
+        'SECRET_KEY = "replaced-by-putup"', content.decode()
+    )
+    files[settings] = (content.encode(), mode)
+    metadata = {
+        "format": SKELETON_FORMAT,
+        "django": version,
+        "placeholder": SKELETON_PLACEHOLDER,
+        "files": {
+            name: {"sha256": hashlib.sha256(content).hexdigest(), "mode": mode}
+            for name, (content, mode) in files.items()
+        },
     }
+    members = {SKELETON_METADATA: (json.dumps(metadata, indent=2).encode(), 0o644)}
+    with zipfile.ZipFile(output, "w") as archive:
+        for name, (content, mode) in {**members, **files}.items():
+            # Fixed timestamps: the same version of Django gives the same bundle
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (mode & 0xFFFF) << 16
+            archive.writestr(info, content, compresslevel=9)
+    logger.report("create", output)
+    return output
+
+
+def load_skeleton(
+    bundle: Path, sha256: Optional[str] = None
+) -> Tuple[dict, Dict[str, Tuple[bytes, int]]]:
+    """Read a bundle created by :obj:`export_skeleton` (through a memory map, so
+    only the members that are used are read from the disk), checking the SHA-256
+    of each file.
+
+    The checksums are stored in the bundle, so they only detect accidental
+    corruption: ``sha256`` pins the digest of the whole bundle.
+
+    Returns:
+        the metadata and the files, as ``{path: (content, mode)}``
 
-    return merge(struct, files), opts
+    Raises:
+        :obj:`InvalidSkeletonBundle`: if the bundle cannot be read, is corrupted,
+            does not match ``sha256`` or has files that :obj:`startproject` would
+            not create
+    """
+    try:
+        with open(bundle, "rb") as file, _MappedFile(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data, zipfile.ZipFile(data) as archive:
+            if sha256 and hashlib.sha256(data).hexdigest() != sha256.lower():
+                raise InvalidSkeletonBundle(bundle, f"SHA-256 is not {sha256}")
+            metadata = json.loads(archive.read(SKELETON_METADATA))
+            if metadata["format"] != SKELETON_FORMAT:
+                raise InvalidSkeletonBundle(bundle, f"format {metadata['format']}")
+            if metadata["placeholder"] != SKELETON_PLACEHOLDER:
+                placeholder = metadata["placeholder"]
+                raise InvalidSkeletonBundle(bundle, f"placeholder {placeholder!r}")
+            files = {}
+            for name, info in metadata["files"].items():
+                if not _is_skeleton_file(name):
+                    raise InvalidSkeletonBundle(bundle, f"unexpected file {name!r}")
+                content = archive.read(name)
+                if hashlib.sha256(content).hexdigest() != info["sha256"]:
+                    raise InvalidSkeletonBundle(bundle, f"wrong checksum of {name}")
+                files[name] = (content, info["mode"])
+    except PyScaffoldDjangoError:
+        raise
+    except Exception as e:
+        raise InvalidSkeletonBundle(bundle, str(e)) from e
+
+    return metadata, files
+
+
+def _is_skeleton_file(name: str) -> bool:
+    # Only the files created by startproject, without parent or absolute paths
+    path = PurePosixPath(name)
+    if path.is_absolute() or any(part in ("", ".", "..") for part in name.split("/")):
+        return False
+    return name == "manage.py" or path.parts[:2] == ("src", SKELETON_PLACEHOLDER)
+
+
+class _MappedFile(mmap.mmap):
+    # ``zipfile`` needs ``seekable`` (only available in Python >= 3.13)
+    def seekable(self):
+        return True
+
+
+def extract_skeleton(
+    bundle: Path,
+    project_path: Path,
+    pkg_name: str,
+    sha256: Optional[str] = None,
+    pretend=False,
+):
+    """Create the files of a bundle created by :obj:`export_skeleton` (the
+    equivalent of :obj:`startproject`), see :obj:`load_skeleton` for ``sha256``
+    """
+    metadata, files = load_skeleton(bundle, sha256)
+    validate_skeleton(files)
+    placeholder = metadata["placeholder"]
+    logger.report("extract", f"{bundle} (Django {metadata['django']})")
+    root = project_path.resolve()
+    for name, (content, mode) in files.items():
+        path = project_path / name.replace(placeholder, pkg_name)
+        if root not in path.resolve().parents:
+            raise InvalidSkeletonBundle(bundle, f"{name} is outside the project")
+        if not pretend:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content.replace(placeholder.encode(), pkg_name.encode()))
+            path.chmod(stat.S_IMODE(mode) & 0o777)
+        logger.report("create", path)
+
+
+def validate_skeleton(files: Dict[str, Tuple[bytes, int]]):
+    """Check that the files of a skeleton (before the project name is replaced)
+    can be changed by :obj:`create_django`, whatever the options.
+
+    Raises:
+        :obj:`DjangoVersionMightBeUnsupported`: listing what was not found
+    """
+    pkg = f"src/{SKELETON_PLACEHOLDER}"
+    values = [*MINIMAL_APPS, *MINIMAL_MIDDLEWARE]
+    settings = [
+        PATTERN,
+        SECRET_KEY_PATTERN,
+        DATABASES_PATTERN,
+        AFTER_DATABASES_PATTERN,
+        TEMPLATES_PATTERN,
+        IMPORTS_PATTERN,
+        *(re.compile(rf"^{name} = \[\n", re.M) for name in LIST_SETTINGS),
+        *(re.compile(rf"^\s+['\"]{re.escape(v)}['\"],$", re.M) for v in values),
+    ]
+    application = [APPLICATION_PATTERN, IMPORTS_PATTERN]
+    checks = {
+        "settings.py": settings,
+        "wsgi.py": application,
+        "asgi.py": application,
+        "urls.py": [URLS_IMPORTS_PATTERN, ADMIN_URLS_PATTERN],
+    }
+
+    missing = []
+    for module, patterns in checks.items():
+        content = files.get(f"{pkg}/{module}", (b"", 0))[0].decode()
+        missing += [
+            f"{p.pattern!r} in {module}" for p in patterns if not p.search(content)
+        ]
+    if f"{pkg}/__main__.py" not in files:
+        missing.append("__main__.py")
+    if missing:
+        raise DjangoVersionMightBeUnsupported(
+            "Failed to find in the skeleton:\n  " + "\n  ".join(missing)
+        )
+
+
+def management_commands(**commands: AbstractContent) -> Structure:
+    """Structure of a ``management`` package with the given commands"""
+    files = {f"{name}.py": content for name, content in commands.items()}
+    return {"__init__.py": "", "commands": {"__init__.py": "", **files}}
+
+
+def structure_paths(struct: Structure, prefix: str = "") -> List[str]:
+    """Paths (relative to the project) of the files in ``struct``"""
+    paths = []
+    for name, content in struct.items():
+        if isinstance(content, dict):
+            paths.extend(structure_paths(content, f"{prefix}{name}/"))
+        else:
+            paths.append(f"{prefix}{name}")
+    return paths
+
+
+def tasks_app(pkg_name: str) -> Structure:
+    """Files for the ``--django-tasks`` app, nested inside the main package"""
+    commands = management_commands(
+        runworker=template("tasks_runworker"), taskstats=template("tasks_taskstats")
+    )
+    tasks = {
+        "__init__.py": template("tasks_init"),
+        "apps.py": template("tasks_apps"),
+        "models.py": template("tasks_models"),
+        "worker.py": template("tasks_worker"),
+        "migrations": {
+            "__init__.py": "",
+            "0001_initial.py": template("tasks_migration_0001"),
+        },
+        "management": commands,
+    }
+    return {
+        "src": {pkg_name: {"tasks": tasks}},
+        "tests": {"test_tasks.py": template("tasks_test")},
+    }
+
+
+def write_manifest(struct: Structure, opts: ScaffoldOpts) -> ActionParams:
+    """When ``--django-seed`` is given, list the SHA-256 of the files generated by
+    :obj:`create_django` (in the format of ``sha256sum``) and set the modification
+    time of every file in the project to ``$SOURCE_DATE_EPOCH``, so identical
+    inputs produce identical trees. See :obj:`pyscaffold.actions.Action`.
+    """
+    if opts.get("django_seed") is None or opts.get("update"):
+        return struct, opts
+
+    project_path = Path(opts["project_path"])
+    manifest = project_path / MANIFEST
+    text = ""
+    if not opts.get("pretend"):
+        for name in opts["django_files"]:
+            digest = hashlib.sha256((project_path / name).read_bytes()).hexdigest()
+            text += f"{digest}  {name}\n"
+        manifest.write_text(text)
+        epoch = int(os.environ.get("SOURCE_DATE_EPOCH", DEFAULT_SOURCE_DATE_EPOCH))
+        for root, dirs, files in os.walk(project_path):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            for name in files + dirs:
+                os.utime(os.path.join(root, name), (epoch, epoch))
+    logger.report("create", manifest)
+
+    # Also part of the structure, so it is committed by ``init_git``
+    return merge(struct, {MANIFEST: text}), opts
+
+
+def secret_key(seed: Optional[str] = None) -> str:
+    """``SECRET_KEY`` for a project, derived from ``seed`` (random by default)"""
+    if seed is None:
+        chars = "".join(secrets.choice(SECRET_KEY_CHARS) for _ in range(50))
+    else:
+        digest = hashlib.sha512(f"pyscaffoldext-django:{seed}".encode()).digest()
+        chars = "".join(
+            SECRET_KEY_CHARS[b % len(SECRET_KEY_CHARS)] for b in digest[:50]
+        )
+    return f"django-insecure-{chars}"
 
 
 def instruct_user(struct, opts):
@@ -125,31 +651,153 @@ def instruct_user(struct, opts):
 PATTERN = re.compile(r"BASE_DIR\s*/\s*['\"]db\.sqlite3['\"]")
 REPLACEMENT = 'BASE_DIR.parent / "db.sqlite3"'
 
+SECRET_KEY_PATTERN = re.compile(r"^SECRET_KEY = .*$", re.M)
+DATABASES_PATTERN = re.compile(r"^DATABASES = \{\n.*?^\}\n", re.M | re.S)
+LOGGING_IMPORT = "from .log import logger_levels"
+
+AFTER_DATABASES_PATTERN = re.compile(r"(?=\n\n# Password validation\n)")
+LIST_SETTINGS = ("INSTALLED_APPS", "MIDDLEWARE")
+TEMPLATES_PATTERN = re.compile(r"^TEMPLATES = \[\n.*?^\]\n", re.M | re.S)
+URLS_IMPORTS_PATTERN = re.compile(
+    r"^from django\.(?:contrib import admin|urls import path)\n", re.M
+)
+ADMIN_URLS_PATTERN = re.compile(
+    r"^urlpatterns = \[\n\s*path\(['\"]admin/['\"], admin\.site\.urls\),\n\]\n", re.M
+)
+APPLICATION_PATTERN = re.compile(r"^application = get_\w+_application\(\)$", re.M)
+IMPORTS_PATTERN = re.compile(
+    r"^(?:import|from) \S.*\n(?:\n*(?:import|from) \S.*\n)*", re.M
+)
+
 
 def replace_default_database(
     logger, file_path, pattern=PATTERN, replacement=REPLACEMENT, pretend=False
 ):
+    target = "default database"
+    replace_in_file(logger, file_path, pattern, replacement, target, pretend=pretend)
+
+
+def replace_in_file(logger, file_path, pattern, replacement, target, pretend=False):
+    """Replace ``pattern`` in a file generated by django-admin.
+    ``replacement`` is either a string (inserted literally) or a function receiving
+    the match object, as in :obj:`re.sub`.
+
+    Raises:
+        :obj:`DjangoVersionMightBeUnsupported`: if ``pattern`` is not found
+    """
     exception = DjangoVersionMightBeUnsupported(
-        "Failed attempt to replace the default sqlite3 database file with "
-        f"{REPLACEMENT} in {file_path}."
+        f"Failed attempt to replace the {target} in {file_path}."
     )
 
     try:
         if not pretend:
             text = file_path.read_text()
-            replaced, n = pattern.subn(replacement, text)
+            repl = replacement if callable(replacement) else lambda _: replacement
+            replaced, n = pattern.subn(repl, text)
             if n < 1:
                 # No substitution was made, there is something wrong with the
                 # assumptions on how the file should be.
                 raise SystemError(text)
             file_path.write_text(replaced)
-        logger.report("replace", f"default database in {file_path}")
+        logger.report("replace", f"{target} in {file_path}")
     except PyScaffoldDjangoError:
         raise
     except Exception as ex:
         raise exception from ex
 
 
+def add_imports(logger, file_path, *statements, pretend=False):
+    """Merge ``statements`` into the first block of imports in a file generated by
+    django-admin, keeping the standard library, ``django`` and relative imports in
+    separated sections (as ``isort`` would do).
+    """
+
+    def _merge(match):
+        existing = [line for line in match.group(0).splitlines() if line]
+        lines = sorted(set(existing + list(statements)), key=_import_sort_key)
+        sections = ([s for s in lines if _import_section(s) == i] for i in range(3))
+        return "\n\n".join("\n".join(s) for s in sections if s) + "\n"
+
+    imports = ", ".join(s.split()[1] for s in statements)
+    replace_in_file(
+        logger,
+        file_path,
+        IMPORTS_PATTERN,
+        _merge,
+        f"imports ({imports})",
+        pretend=pretend,
+    )
+
+
+def _import_section(statement):
+    module = statement.split()[1]
+    if module.startswith("."):
+        return 2
+    return 1 if module.split(".")[0] == "django" else 0
+
+
+def _import_sort_key(statement):
+    # Plain ``import x`` statements come before ``from x import y`` (isort's default)
+    return (statement.startswith("from"), statement.split()[1])
+
+
+def add_to_list_setting(logger, file_path, name, *values, pretend=False):
+    """Append ``values`` to a list setting (e.g. ``INSTALLED_APPS``) in a file
+    generated by django-admin.
+    """
+    pattern = re.compile(rf"^({name} = \[\n(?:.*\n)*?)(\]\n)", re.M)
+    items = "".join(f'    "{value}",\n' for value in values)
+
+    def _append(match):
+        return match.group(1) + items + match.group(2)
+
+    replace_in_file(logger, file_path, pattern, _append, name, pretend=pretend)
+
+
+def remove_from_list_setting(logger, file_path, name, *values, pretend=False):
+    """Remove ``values`` from a list setting (e.g. ``INSTALLED_APPS``) in a file
+    generated by django-admin.
+
+    Raises:
+        :obj:`DjangoVersionMightBeUnsupported`: if one of the values is not found
+    """
+    pattern = re.compile(rf"^{name} = \[\n(?:.*\n)*?\]\n", re.M)
+
+    def _remove(match):
+        lines = match.group(0).splitlines(keepends=True)
+        kept = [line for line in lines if line.strip(" \n,'\"") not in values]
+        if len(lines) - len(kept) != len(values):
+            raise SystemError(match.group(0))
+        return "".join(kept)
+
+    replace_in_file(logger, file_path, pattern, _remove, name, pretend=pretend)
+
+
+def append_to_file(logger, file_path, text, target, pretend=False):
+    """Append ``text`` to a file generated by django-admin"""
+    if not pretend:
+        with file_path.open("a") as file:
+            file.write(text)
+    logger.report("append", f"{target} to {file_path}")
+
+
+def store_true_with(*extensions: Extension):
+    """Create a custom :obj:`argparse.Action` for a flag that stores ``True``
+    in addition to saving the extension for activation (see
+    :obj:`pyscaffold.extensions.store_with`).
+    """
+
+    class StoreTrueAndInclude(include(*extensions)):  # type: ignore
+        def __init__(self, option_strings, dest, **kwargs):
+            super().__init__(option_strings, dest, nargs=0, **kwargs)
+
+        def __call__(self, parser, namespace, values, option_string=None):
+            super().__call__(parser, namespace, values, option_string)
+            setattr(namespace, self.dest, True)
+
+    return StoreTrueAndInclude
+
+
 class PyScaffoldDjangoError(RuntimeError):
     """Base class for all the exceptions in this package"""
 
@@ -177,3 +825,22 @@ class DjangoAdminNotInstalled(PyScaffoldDjangoError):
 
     def __init__(self, message=DEFAULT_MESSAGE, *args, **kwargs):
         super(DjangoAdminNotInstalled, self).__init__(message, *args, **kwargs)
+
+
+class InvalidSkeletonBundle(PyScaffoldDjangoError):
+    """The skeleton bundle cannot be read or is corrupted."""
+
+    def __init__(self, bundle, reason, *args, **kwargs):
+        message = f"Invalid skeleton bundle {bundle}: {reason}"
+        super(InvalidSkeletonBundle, self).__init__(message, *args, **kwargs)
+
+
+class UnsupportedDatabaseBackend(PyScaffoldDjangoError):
+    """The given database backend is not supported by the extension."""
+
+    def __init__(self, backend, *args, **kwargs):
+        message = (
+            f"The database backend {backend!r} is not supported, "
+            f"please choose one of {', '.join(DATABASE_BACKENDS)}."
+        )
+        super(UnsupportedDatabaseBackend, self).__init__(message, *args, **kwargs)
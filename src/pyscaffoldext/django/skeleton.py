@@ -0,0 +1,85 @@
+"""
+Command line interface to export and verify the skeleton bundles used by
+``putup --django --django-skeleton BUNDLE`` (so django-admin is not needed when
+the project is created).
+
+One bundle is exported per version of Django, using the corresponding
+django-admin::
+
+    putup-django-skeleton export --django-admin /opt/django4.2/bin/django-admin
+    putup-django-skeleton verify django-skeleton-4.2.30.zip
+
+Both print the SHA-256 of the bundles, to be pinned with
+``--django-skeleton-sha256``.
+"""
+
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from pyscaffold.exceptions import exceptions2exit
+from pyscaffold.shell import ShellCommand, shell_command_error2exit_decorator
+
+from .extension import export_skeleton, load_skeleton, validate_skeleton
+
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="putup-django-skeleton",
+        description="Export the files created by django-admin to a compressed, "
+        "checksummed bundle for putup --django --django-skeleton BUNDLE.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="create a bundle")
+    export.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="path of the bundle (default: django-skeleton-<version>.zip)",
+    )
+    export.add_argument(
+        "--django-admin",
+        metavar="PATH",
+        help="django-admin of the Django version to export (default: the one "
+        "in the PATH)",
+    )
+    verify = commands.add_parser(
+        "verify", help="check the checksums and the contents of bundles"
+    )
+    verify.add_argument("bundles", nargs="+", type=Path, metavar="BUNDLE")
+    return parser.parse_args(args)
+
+
+def main(args: List[str]):
+    """Main entry point for external applications
+
+    Args:
+        args: command line arguments
+    """
+    opts = parse_args(args)
+    if opts.command == "export":
+        command = ShellCommand(opts.django_admin) if opts.django_admin else None
+        bundle = export_skeleton(opts.output, command)
+        digest = hashlib.sha256(bundle.read_bytes()).hexdigest()
+        print(f"{digest}  {bundle}")
+        return
+
+    for bundle in opts.bundles:
+        metadata, files = load_skeleton(bundle)
+        validate_skeleton(files)
+        digest = hashlib.sha256(bundle.read_bytes()).hexdigest()
+        print(f"{bundle}: OK (Django {metadata['django']}, {len(files)} files)")
+        print(f"    --django-skeleton-sha256 {digest}")
+
+
+@shell_command_error2exit_decorator
+@exceptions2exit([RuntimeError])
+def run(args: Optional[List[str]] = None):
+    """Entry point for console script"""
+    main(args or sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,3 +1,4 @@
+import json
 import sys
 from contextlib import suppress
 from glob import glob
@@ -65,6 +66,8 @@ TASKS = [
     "clearsessions",
     "showmigrations",
     "createsuperuser --username admin --email admin@localhost --no-input",
+    "warmup --url /admin/login/",
+    "check --tag performance --fail-level WARNING",
 ]
 
 
@@ -111,3 +114,281 @@ def test_manage_py_runs_nicely(tmpfolder, name, command):
                 run(f"{command} {task}", env=env)
     finally:
         remove_eventual_package(name)
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_tasks_run_nicely(tmpfolder):
+    # Given we have a project generated with putup --django --django-tasks pkg
+    # (and a read replica)
+    name = "pkgtasks"
+    run(PUTUP, "--no-config", FLAG, f"{FLAG}-tasks", f"{FLAG}-replica", name)
+    with chdir(tmpfolder / name):
+        env = merge_env(PYTHONPATH=str(Path("src").resolve()))
+        run(f"{PYTHON} manage.py migrate", env=env)
+        # when tasks are enqueued,
+        enqueue = (
+            "from pkgtasks.tasks.models import Task; Task.objects.enqueue('os.getpid')"
+        )
+        run(PYTHON, "manage.py", "shell", "-c", enqueue, env=env)
+        # then the worker should run them in a separated process
+        run(f"{PYTHON} manage.py runworker --burst --concurrency 2 --poll 0.1", env=env)
+        assert "done=1" in run(f"{PYTHON} manage.py taskstats", env=env)
+        # even when a task kills the process running it
+        crash = (
+            "from pkgtasks.tasks.models import Task; "
+            "Task.objects.enqueue('os._exit', 1, max_attempts=1); "
+            "Task.objects.enqueue('os.getpid'); Task.objects.enqueue('os.getpid')"
+        )
+        run(PYTHON, "manage.py", "shell", "-c", crash, env=env)
+        run(f"{PYTHON} manage.py runworker --burst --concurrency 1 --poll 0.1", env=env)
+        stats = run(f"{PYTHON} manage.py taskstats", env=env)
+        assert "queued=0 running=0 done=3 failed=1" in stats
+        # and the generated tests should pass
+        run(f"{PYTHON} -m pytest -o addopts= tests", env=env)
+
+
+AUDITED_TESTS = """\
+from django.contrib.auth.models import Group, Permission
+
+
+def test_n_plus_one(db):
+    for i in range(6):
+        Group.objects.create(name=f"group{i}")
+    for group in Group.objects.all():
+        list(group.permissions.all())
+
+
+def test_full_scan(db):
+    Group.objects.filter(name__endswith="x").exists()
+"""
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_queryaudit_runs_nicely(tmpfolder):
+    # Given we have a project generated with putup --django --django-tasks pkg
+    name = "pkgaudit"
+    run(PUTUP, "--no-config", FLAG, f"{FLAG}-tasks", name)
+    with chdir(tmpfolder / name):
+        # with a test doing N+1 queries and a full scan,
+        Path("tests/test_audit.py").write_text(AUDITED_TESTS)
+        # and the size of the table in production,
+        Path("rows.json").write_text('{"auth_group": 100000}')
+        # when the queries of the tests are audited,
+        audit = f"{PYTHON} manage.py queryaudit --json --table-rows rows.json"
+        out = run(f"{audit} -- -p no:terminal -o addopts= tests")
+        # then the N+1 queries should be reported with the line issuing them
+        issues = json.loads(out)
+        kinds = {issue["kind"] for issue in issues}
+        assert {"n+1", "scan"} <= kinds
+        assert "error" not in kinds
+        n_plus_one = next(issue for issue in issues if issue["kind"] == "n+1")
+        assert "tests/test_audit.py:8" in n_plus_one["sites"]
+        # and the full scan of the large table
+        scan = next(issue for issue in issues if issue["kind"] == "scan")
+        assert "auth_group" in scan["detail"]
+        assert "100000 rows" in scan["detail"]
+        # and the threshold should make it fail
+        with pytest.raises(CalledProcessError):
+            run(f"{audit} --fail-above 1 -- -p no:terminal -o addopts= tests")
+        # without touching the database of the project
+        assert not Path("db.sqlite3").exists()
+
+
+ADMIN_LOGIN = """\
+from django.contrib.auth import authenticate, get_user_model
+from django.test import Client
+
+assert get_user_model().objects.count() == 1
+assert authenticate(username="admin", password="s3cr3t-pass") is not None
+client = Client(HTTP_HOST="localhost")
+credentials = {"username": "admin", "password": "s3cr3t-pass"}
+response = client.post("/admin/login/?next=/admin/", credentials)
+assert response.status_code == 302, response.status_code
+assert client.get("/admin/").status_code == 200
+print("logged in")
+"""
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_replica_runs_nicely(tmpfolder):
+    # Given we have a project generated with putup --django --django-replica pkg
+    name = "pkgreplica"
+    run(PUTUP, "--no-config", FLAG, f"{FLAG}-replica", name)
+    with chdir(tmpfolder / name):
+        env = merge_env(DJANGO_SUPERUSER_PASSWORD="s3cr3t-pass")
+        run(f"{PYTHON} manage.py migrate", env=env)
+        # when a user is created (written to the primary database),
+        args = "--username admin --email admin@localhost --no-input"
+        run(f"{PYTHON} manage.py createsuperuser {args}", env=env)
+        # then it should be able to log in (reading from the replica)
+        out = run(PYTHON, "manage.py", "shell", "-c", ADMIN_LOGIN, env=env)
+        assert "logged in" in out
+
+
+LEAKING_REQUESTS = """\
+from django.core.signals import request_finished
+from django.test import Client
+
+leak = []
+request_finished.connect(lambda **kwargs: leak.append(bytearray(10000)), weak=False)
+client = Client(HTTP_HOST="localhost")
+for _ in range(20):
+    assert client.get("/admin/login/").status_code == 200
+"""
+
+MIDDLEWARE_NOT_USED = """\
+from django.core.exceptions import MiddlewareNotUsed
+from pkgmemtrace.memtrace import MemoryTraceMiddleware
+
+try:
+    MemoryTraceMiddleware(print)
+except MiddlewareNotUsed:
+    print("not used")
+"""
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_memtrace_runs_nicely(tmpfolder):
+    # Given we have a project generated with putup --django pkg
+    name = "pkgmemtrace"
+    run(PUTUP, "--no-config", FLAG, name)
+    with chdir(tmpfolder / name):
+        reports = str(Path("reports").resolve())
+        env = merge_env(DJANGO_MEMTRACE_DIR=reports)
+        env.pop("DJANGO_MEMTRACE", None)
+        run(f"{PYTHON} manage.py migrate", env=env)
+        # when requests leaking memory are served with the middleware enabled
+        # (in every worker, with a snapshot every 2 requests),
+        memtrace = dict(
+            DJANGO_MEMTRACE="1", DJANGO_MEMTRACE_SAMPLE="1", DJANGO_MEMTRACE_EVERY="2"
+        )
+        shell = [PYTHON, "manage.py", "shell", "-c"]
+        run(*shell, LEAKING_REQUESTS, env=merge_env(env, **memtrace))
+        # then the report should contain the RSS of the worker over time
+        out = run(f"{PYTHON} manage.py memreport --json", env=env)
+        report = json.loads(out)
+        (worker,) = report["workers"].values()
+        assert worker["requests"] == list(range(0, 21, 2))
+        assert len(worker["rss"]) == 11
+        # and the leaking line should be the site growing the most
+        site, growing = next(iter(report["growing"].items()))
+        assert site == "<string>:5"
+        assert growing["streak"] >= 3
+        # and without DJANGO_MEMTRACE, Django should drop the middleware
+        assert "not used" in run(*shell, MIDDLEWARE_NOT_USED, env=env)
+        run(*shell, LEAKING_REQUESTS, env=merge_env(env, DJANGO_MEMTRACE_DIR="off"))
+        assert not Path("off").exists()
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_performance_checks_run_nicely(tmpfolder):
+    # Given we have a project generated with putup --django pkg
+    name = "pkgchecks"
+    run(PUTUP, "--no-config", FLAG, name)
+    with chdir(tmpfolder / name):
+        run(f"{PYTHON} manage.py migrate")
+        # when the performance checks run,
+        args = "--tag performance --fail-level WARNING"
+        # then the default settings should be fine for local development
+        run(f"{PYTHON} manage.py check {args}")
+        # but not for a deployment
+        with pytest.raises(CalledProcessError) as exc:
+            run(f"{PYTHON} manage.py check --deploy {args}")
+        for check_id in ("W001", "W004", "W005", "W006"):
+            assert f"performance.{check_id}" in exc.value.output
+        assert "HINT: Set DEBUG = False" in exc.value.output
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_warmup_on_load_runs_nicely(tmpfolder):
+    # Given we have a project generated with putup --django pkg
+    name = "pkgwarmup"
+    run(PUTUP, "--no-config", FLAG, name)
+    with chdir(tmpfolder / name):
+        # with a template that cannot be compiled,
+        Path(f"src/{name}/templates").mkdir()
+        Path(f"src/{name}/templates/broken.html").write_text("{% if %}")
+        # when the application is loaded with DJANGO_WARMUP=1,
+        env = merge_env(DJANGO_WARMUP="1", PYTHONPATH=str(Path("src").resolve()))
+        out = run(PYTHON, "-c", f"import {name}.wsgi", env=env)
+        # then the errors should be logged
+        assert "WARNING" in out and "broken.html" in out
+        # and the package should not be compiled (that is done by the command)
+        assert not Path(f"src/{name}/management/commands/__pycache__").exists()
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_benchmarks_run_nicely(tmpfolder):
+    # Given we have a project generated with putup --django pkg
+    name = "pkgbench"
+    run(PUTUP, "--no-config", FLAG, name)
+    with chdir(tmpfolder / name):
+        # when the benchmarks run with few iterations,
+        bench_logging = run(f"{PYTHON} benchmarks/bench_logging.py --requests 10")
+        bench_health = run(f"{PYTHON} benchmarks/bench_health.py --probes 10")
+        # then they should report the results
+        assert "queued" in bench_logging
+        assert "healthz" in bench_health
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_bulkload_runs_nicely(tmpfolder):
+    # Given we have a project generated with putup --django pkg
+    name = "pkgbulk"
+    run(PUTUP, "--no-config", FLAG, name)
+    with chdir(tmpfolder / name):
+        run(f"{PYTHON} manage.py migrate")
+        # and files with rows for a model
+        rows = "".join(f"{i},group{i}\n" for i in range(1, 101))
+        Path("groups.csv").write_text("id,name\n" + rows)
+        Path("groups.jsonl").write_text(
+            '{"model": "auth.group", "fields": {"name": "x"}}'
+        )
+        # when they are loaded in small batches,
+        args = "--batch-size 7 --batches-per-transaction 3 --defer-indexes"
+        run(f"{PYTHON} manage.py bulkload auth.Group groups.csv {args}")
+        out = run(
+            f"{PYTHON} manage.py bulkload auth.Group groups.jsonl --unsafe-sqlite"
+        )
+        # then all the rows should be in the database
+        assert "Loaded 1 auth.Group objects" in out
+        count = (
+            "from django.contrib.auth.models import Group; print(Group.objects.count())"
+        )
+        assert run(PYTHON, "manage.py", "shell", "-c", count).strip() == "101"
+        # and an unknown column should be reported without a traceback
+        Path("unknown.csv").write_text("id,title\n1,x\n")
+        with pytest.raises(CalledProcessError) as exc:
+            run(f"{PYTHON} manage.py bulkload auth.Group unknown.csv")
+        assert "title: unknown field of auth.Group" in exc.value.output
+        assert "Traceback" not in exc.value.output
+        # and so should an invalid value (with its column and line)
+        Path("invalid.csv").write_text("id,name\n102,ok\nx,g\n")
+        with pytest.raises(CalledProcessError) as exc:
+            run(f"{PYTHON} manage.py bulkload auth.Group invalid.csv")
+        assert "line 3, id: " in exc.value.output
+        assert "must be an integer" in exc.value.output
+        assert "Traceback" not in exc.value.output
+
+
+@pytest.mark.slow
+@pytest.mark.system
+def test_minimal_runs_nicely(tmpfolder):
+    # Given we have a project generated with putup --django --django-minimal pkg
+    name = "pkgminimal"
+    run(PUTUP, "--no-config", FLAG, f"{FLAG}-minimal", name)
+    with chdir(tmpfolder / name):
+        # when the checks and the tests run,
+        run(f"{PYTHON} manage.py check --fail-level WARNING")
+        run(f"{PYTHON} manage.py test")
+        # then the benchmark should compare it with the default skeleton
+        out = run(f"{PYTHON} benchmarks/bench_minimal.py --runs 1 --requests 10")
+        assert "minimal" in out and "default" in out
@@ -1,17 +1,58 @@
+import hashlib
+import json
 import logging
+import os
 import re
+import sys
+import zipfile
 from pathlib import Path
+from subprocess import check_output
 
 import pytest
 from pyscaffold import __version__ as pyscaffold_version
 from pyscaffold.api import NO_CONFIG, create_project
 from pyscaffold.cli import parse_args, run
+from pyscaffold.log import logger
 from pyscaffold.templates import get_template
 
-from pyscaffoldext.django.extension import Django, DjangoAdminNotInstalled
+from pyscaffoldext.django.extension import (
+    MANIFEST,
+    SKELETON_FORMAT,
+    SKELETON_METADATA,
+    SKELETON_PLACEHOLDER,
+    Django,
+    DjangoAdminNotInstalled,
+    DjangoVersionMightBeUnsupported,
+    InvalidSkeletonBundle,
+    UnsupportedDatabaseBackend,
+    add_imports,
+    export_skeleton,
+    extract_skeleton,
+    load_skeleton,
+    remove_from_list_setting,
+    secret_key,
+)
+from pyscaffoldext.django.skeleton import main as skeleton_main
 
 PROJ_NAME = "proj"
-DJANGO_FILES = ["proj/manage.py", "proj/src/proj/wsgi.py", "proj/src/proj/__main__.py"]
+DJANGO_FILES = [
+    "proj/manage.py",
+    "proj/src/proj/wsgi.py",
+    "proj/src/proj/__main__.py",
+    "proj/src/proj/log.py",
+    "proj/src/proj/warmup.py",
+    "proj/src/proj/management/commands/warmup.py",
+    "proj/src/proj/management/commands/bulkload.py",
+    "proj/src/proj/queryaudit.py",
+    "proj/src/proj/management/commands/queryaudit.py",
+    "proj/src/proj/apps.py",
+    "proj/src/proj/checks.py",
+    "proj/src/proj/memtrace.py",
+    "proj/src/proj/management/commands/memreport.py",
+    "proj/src/proj/health.py",
+    "proj/benchmarks/bench_logging.py",
+    "proj/benchmarks/bench_health.py",
+]
 
 FLAG = Django().flag
 
@@ -131,3 +172,379 @@ def test_cli_with_django_and_update(tmpfolder, caplog):
         assert "will be ignored" in out_err
     except AssertionError:
         pytest.xfail("pytest-dev/pytest#5997")
+
+
+@pytest.mark.slow
+def test_logging_is_configured(tmpfolder):
+    # Given the command line with the django option,
+    args = ["--no-config", FLAG, PROJ_NAME]
+    # --no-config: avoid extra config from dev's machine interference
+
+    # when pyscaffold runs,
+    run(args)
+
+    # then all the records should go through the queue handler
+    settings = Path(PROJ_NAME, "src", PROJ_NAME, "settings.py").read_text()
+    assert f'"()": "{PROJ_NAME}.log.QueueHandler"' in settings
+    assert "from .log import logger_levels\n" in settings
+    compile(settings, "settings.py", "exec")
+
+
+@pytest.mark.slow
+def test_health_checks_wrap_the_application(tmpfolder):
+    # Given the command line with the django option,
+    args = ["--no-config", FLAG, PROJ_NAME]
+    # --no-config: avoid extra config from dev's machine interference
+
+    # when pyscaffold runs,
+    run(args)
+
+    # then the WSGI and ASGI applications should answer the probes
+    for module in ("wsgi", "asgi"):
+        code = Path(PROJ_NAME, "src", PROJ_NAME, f"{module}.py").read_text()
+        wrapper = f"{module.upper()}HealthCheck"
+        assert f"from .health import {wrapper}\n" in code
+        assert f"application = {wrapper}(get_{module}_application())" in code
+    # and the probes should be answered without calling the application
+    env = {**os.environ, "PYTHONPATH": str(Path(PROJ_NAME, "src").resolve())}
+    script = PROBES.replace("proj.", f"{PROJ_NAME}.")
+    out = check_output([sys.executable, "-c", script], cwd=PROJ_NAME, env=env)
+    assert out.decode().strip() == "probes ok"
+
+
+PROBES = """\
+import asyncio
+
+from django.db import connections
+
+import proj.wsgi  # noqa: sets up Django
+from proj.health import ASGIHealthCheck, WSGIHealthCheck
+
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [])
+    return [b"app"]
+
+
+async def asgi_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"app"})
+
+
+def call_wsgi(path, **kwargs):
+    app = WSGIHealthCheck(wsgi_app, ttl=0, **kwargs)
+    status = []
+    body = b"".join(app({"PATH_INFO": path}, lambda s, h: status.append(s)))
+    return int(status[0].split()[0]), body
+
+
+def call_asgi(path, **kwargs):
+    app = ASGIHealthCheck(asgi_app, ttl=0, **kwargs)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "path": path}, None, send))
+    return sent[0]["status"], sent[1]["body"]
+
+
+for call in (call_wsgi, call_asgi):
+    assert call("/healthz") == (200, b"ok")
+    assert call("/other") == (200, b"app")
+    # readiness is disabled by default
+    assert call("/readyz") == (200, b"app")
+    assert call("/readyz", ready_path="/readyz") == (200, b"ok")
+
+# the connections opened by the readiness check are closed
+assert connections["default"].connection is None
+
+connections["default"].settings_dict["NAME"] = "/nonexistent/db.sqlite3"
+for call in (call_wsgi, call_asgi):
+    assert call("/readyz", ready_path="/readyz") == (503, b"unavailable")
+print("probes ok")
+"""
+
+
+def test_add_imports(tmpfolder, isolated_log):
+    # Given a file generated by django-admin,
+    file = tmpfolder / "settings.py"
+    file.write_text('"""Docstring"""\n\nfrom pathlib import Path\n\nX = 1\n')
+
+    # when imports are added,
+    add_imports(logger, file, "import django", "from .log import x", "import os")
+
+    # then they should be sorted in sections
+    expected = (
+        "import os\nfrom pathlib import Path\n\nimport django\n\nfrom .log import x\n"
+    )
+    assert file.read_text() == f'"""Docstring"""\n\n{expected}\nX = 1\n'
+
+
+@pytest.mark.slow
+def test_cli_with_django_and_postgres(tmpfolder):
+    # Given the command line with the django and database options,
+    args = ["--no-config", FLAG, f"{FLAG}-db", "postgres", PROJ_NAME]
+    # --no-config: avoid extra config from dev's machine interference
+
+    # when pyscaffold runs,
+    run(args)
+
+    # then the database should be configured via environment variables
+    settings = Path(PROJ_NAME, "src", PROJ_NAME, "settings.py").read_text()
+    assert "django.db.backends.postgresql" in settings
+    assert "sqlite3" not in settings
+    assert '"CONN_HEALTH_CHECKS": True' in settings
+    assert "DISABLE_SERVER_SIDE_CURSORS" in settings
+    assert '["OPTIONS"]["pool"]' in settings
+    # with the required imports on top of the file
+    assert (
+        "import os\nfrom pathlib import Path\n\nimport django\n\nfrom .log" in settings
+    )
+    # and the generated code should be valid python
+    compile(settings, "settings.py", "exec")
+    # and the driver should be a dependency of the project
+    setup_cfg = Path(PROJ_NAME, "setup.cfg").read_text()
+    assert "psycopg[binary,pool]" in setup_cfg
+    # with a version of Django that supports psycopg 3
+    assert "django>=4.2" in setup_cfg
+
+
+def test_create_project_with_unsupported_database(tmpfolder):
+    # Given options with an unknown database backend,
+    opts = dict(
+        project_path=PROJ_NAME,
+        extensions=[Django()],
+        django_db="oracle",
+        config_files=NO_CONFIG,
+    )
+
+    # when the project is created,
+    # then an exception should be raised.
+    with pytest.raises(UnsupportedDatabaseBackend):
+        create_project(opts)
+
+
+@pytest.mark.slow
+def test_cli_with_django_tasks(tmpfolder):
+    # Given the command line with the django and tasks options,
+    args = ["--no-config", FLAG, f"{FLAG}-tasks", PROJ_NAME]
+    # --no-config: avoid extra config from dev's machine interference
+
+    # when pyscaffold runs,
+    run(args)
+
+    # then the tasks app should be created inside the package
+    app = Path(PROJ_NAME, "src", PROJ_NAME, "tasks")
+    assert Path(app, "migrations", "0001_initial.py").exists()
+    assert Path(app, "management", "commands", "runworker.py").exists()
+    assert Path(PROJ_NAME, "tests", "test_tasks.py").exists()
+    # and installed
+    settings = Path(PROJ_NAME, "src", PROJ_NAME, "settings.py").read_text()
+    assert re.search(r"INSTALLED_APPS = \[\n[^\]]+\"proj.tasks\",\n\]", settings)
+
+
+@pytest.mark.slow
+def test_cli_with_django_replica(tmpfolder):
+    # Given the command line with the django and replica options,
+    args = ["--no-config", FLAG, f"{FLAG}-replica", PROJ_NAME]
+    # --no-config: avoid extra config from dev's machine interference
+
+    # when pyscaffold runs,
+    run(args)
+
+    # then a router should be created
+    assert Path(PROJ_NAME, "src", PROJ_NAME, "routers.py").exists()
+    assert Path(PROJ_NAME, "tests", "test_routers.py").exists()
+    # and a replica should be configured right after the primary database
+    settings = Path(PROJ_NAME, "src", PROJ_NAME, "settings.py").read_text()
+    databases = settings.index("DATABASES = {")
+    replica = settings.index('DATABASES["replica"] = {')
+    assert databases < replica < settings.index("# Password validation")
+    assert 'DATABASE_ROUTERS = ["proj.routers.ReplicaRouter"]' in settings
+    middleware = r"MIDDLEWARE = \[\n[^\]]+\"proj.routers.PinPrimaryMiddleware\","
+    assert re.search(middleware, settings)
+    compile(settings, "settings.py", "exec")
+
+
+@pytest.mark.slow
+def test_cli_with_django_seed(tmpfolder, monkeypatch):
+    # Given the command line with the django and seed options,
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1000000000")
+    args = ["--no-config", FLAG, f"{FLAG}-seed", "abc"]
+    # --no-config: avoid extra config from dev's machine interference
+
+    # when pyscaffold runs twice (with different secrets in the environment),
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "first-secret")
+    run([*args, "first/proj"])
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "second-secret")
+    run([*args, "second/proj"])
+
+    # then the Django files should be identical
+    manifests = [Path(d, "proj", MANIFEST).read_text() for d in ("first", "second")]
+    assert manifests[0] == manifests[1]
+    assert "  src/proj/settings.py\n" in manifests[0]
+    assert "  src/proj/log.py\n" in manifests[0]
+    settings = Path("first", "proj", "src", "proj", "settings.py").read_text()
+    # and the key should be read at runtime, with a default derived from the seed
+    assert "first-secret" not in settings
+    assert f'    "DJANGO_SECRET_KEY",\n    "{secret_key("abc")}",\n)' in settings
+    # with the same modification times
+    assert Path("first", "proj", "setup.cfg").stat().st_mtime == 1000000000
+
+
+def test_secret_key():
+    # The key is derived from the seed, like the keys generated by django-admin
+    key = secret_key("abc")
+    assert key == secret_key("abc") != secret_key("abd")
+    assert key.startswith("django-insecure-") and len(key) == 66
+
+
+@pytest.mark.slow
+def test_cli_with_django_minimal(tmpfolder):
+    # Given the command line with the django and minimal options,
+    args = ["--no-config", FLAG, f"{FLAG}-minimal", PROJ_NAME]
+    # --no-config: avoid extra config from dev's machine interference
+
+    # when pyscaffold runs,
+    run(args)
+
+    # then admin, auth, sessions, messages and staticfiles should not be installed
+    settings = Path(PROJ_NAME, "src", PROJ_NAME, "settings.py").read_text()
+    for name in ("admin", "auth", "sessions", "messages", "staticfiles"):
+        assert f'"django.contrib.{name}",' not in settings
+        assert f'"django.contrib.{name}.middleware.' not in settings
+    assert '"django.contrib.contenttypes",' in settings
+    assert "TEMPLATES = []\n" in settings
+    compile(settings, "settings.py", "exec")
+    # and the admin should not be routed
+    urls = Path(PROJ_NAME, "src", PROJ_NAME, "urls.py").read_text()
+    assert "admin" not in urls.split('"""')[-1]
+    assert "urlpatterns = []\n" in urls
+    # and a benchmark should compare it with the default skeleton
+    assert Path(PROJ_NAME, "benchmarks", "bench_minimal.py").exists()
+
+
+def test_remove_from_list_setting(tmpfolder, isolated_log):
+    # Given a file generated by django-admin (without black),
+    file = tmpfolder / "settings.py"
+    file.write_text("APPS = [\n    'a',\n    'b',\n    'c',\n]\n")
+
+    # when values are removed from a list,
+    remove_from_list_setting(logger, file, "APPS", "a", "c")
+
+    # then the other values should be kept
+    assert file.read_text() == "APPS = [\n    'b',\n]\n"
+    # and an exception should be raised if a value is not found
+    with pytest.raises(DjangoVersionMightBeUnsupported):
+        remove_from_list_setting(logger, file, "APPS", "b", "d")
+    assert file.read_text() == "APPS = [\n    'b',\n]\n"
+
+
+@pytest.mark.slow
+def test_cli_with_django_skeleton(tmpfolder, capsys, request):
+    # Given a skeleton bundle exported twice,
+    bundle = export_skeleton(tmpfolder / "skeleton.zip")
+    again = export_skeleton(tmpfolder / "again.zip")
+    # which should be reproducible,
+    assert bundle.read_bytes() == again.read_bytes()
+    # and verified by the command line tool,
+    skeleton_main(["verify", str(bundle)])
+    out = capsys.readouterr().out
+    assert "OK (Django" in out
+    digest = hashlib.sha256(bundle.read_bytes()).hexdigest()
+    assert f"--django-skeleton-sha256 {digest}" in out
+
+    # when pyscaffold runs with the bundle (pinning its digest) and no django-admin,
+    request.getfixturevalue("nodjango_admin_mock")
+    skeleton = [f"{FLAG}-skeleton", str(bundle), f"{FLAG}-skeleton-sha256", digest]
+    run(["--no-config", FLAG, *skeleton, PROJ_NAME])
+
+    # then django files should exist
+    for path in DJANGO_FILES:
+        assert Path(path).exists()
+    # with the name of the project instead of the placeholder
+    settings = Path(PROJ_NAME, "src", PROJ_NAME, "settings.py").read_text()
+    assert re.search(r"ROOT_URLCONF = [\'\"]proj.urls[\'\"]", settings)
+    # and a new secret key
+    assert "replaced-by-putup" not in settings
+
+
+def test_load_corrupted_skeleton(tmpfolder):
+    # Given a bundle that is not a zip file,
+    bundle = Path("skeleton.zip")
+    bundle.write_bytes(b"not a zip file")
+
+    # when it is loaded,
+    # then an exception should be raised.
+    with pytest.raises(InvalidSkeletonBundle):
+        load_skeleton(bundle)
+
+
+def write_bundle(path, files, checksums=None):
+    """Bundle with the given files (``checksums`` replace the right ones)"""
+    metadata = {
+        "format": SKELETON_FORMAT,
+        "django": "4.2",
+        "placeholder": SKELETON_PLACEHOLDER,
+        "files": {
+            name: {"sha256": hashlib.sha256(content).hexdigest(), "mode": 0o644}
+            for name, content in files.items()
+        },
+    }
+    for name, checksum in (checksums or {}).items():
+        metadata["files"][name]["sha256"] = checksum
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(SKELETON_METADATA, json.dumps(metadata))
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return path
+
+
+def test_load_skeleton(tmpfolder):
+    # Given a bundle with the files of django-admin startproject,
+    files = {"manage.py": b"manage", f"src/{SKELETON_PLACEHOLDER}/urls.py": b"urls"}
+    bundle = write_bundle(Path("skeleton.zip"), files)
+    digest = hashlib.sha256(bundle.read_bytes()).hexdigest()
+
+    # when it is loaded (pinning its digest),
+    metadata, loaded = load_skeleton(bundle, digest)
+
+    # then the files should be read
+    assert {name: content for name, (content, _) in loaded.items()} == files
+    # but another digest should be refused
+    with pytest.raises(InvalidSkeletonBundle, match="SHA-256"):
+        load_skeleton(bundle, "0" * 64)
+
+
+def test_load_tampered_skeleton(tmpfolder):
+    # Given a bundle in which a file was changed after the export,
+    checksums = {"manage.py": hashlib.sha256(b"original").hexdigest()}
+    bundle = write_bundle(Path("skeleton.zip"), {"manage.py": b"changed"}, checksums)
+
+    # when it is loaded,
+    # then an exception should be raised.
+    with pytest.raises(InvalidSkeletonBundle, match="checksum of manage.py"):
+        load_skeleton(bundle)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        f"src/{SKELETON_PLACEHOLDER}/../../../outside.py",
+        "../outside.py",
+        "/tmp/outside.py",
+        "setup.py",
+    ],
+)
+def test_load_skeleton_outside_project(tmpfolder, name):
+    # Given a bundle with a file that django-admin would not create,
+    bundle = write_bundle(Path("skeleton.zip"), {name: b"print('owned')"})
+
+    # when it is used to create a project,
+    # then an exception should be raised.
+    with pytest.raises(InvalidSkeletonBundle, match="unexpected file"):
+        extract_skeleton(bundle, Path(PROJ_NAME), PROJ_NAME)
+    # without creating any file
+    assert not Path(PROJ_NAME).exists()
+    assert not Path("outside.py").exists()